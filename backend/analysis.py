@@ -1,10 +1,82 @@
 # analysis.py
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # headless backend: no GUI event loop, safe in worker processes
 import seaborn as sns
 import matplotlib.pyplot as plt
+
+# 80 dpi is plenty for gallery thumbnails and cuts both rasterization time
+# and the PNG bytes served from /plots; no automatic layout solves either
+# (tight_layout is kept only for the annotated heatmaps that need it).
+plt.rcParams["savefig.dpi"] = 80
+plt.rcParams["figure.autolayout"] = False
+
 import os
 import uuid
+import multiprocessing
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; pandas .corr() is used instead
+    njit = None
+
+if njit is not None:
+    # Parallel Pearson correlation over a contiguous float64 matrix. For the
+    # interactive heatmap this beats pandas' .corr() dispatch, especially when
+    # the same dataset is re-charted repeatedly. Expects no NaNs (callers
+    # dropna first).
+    #
+    # Compiled lazily on the first heatmap request rather than warmed at
+    # import: a warmup would add multi-second JIT time to every server start
+    # for a chart that may never be requested, and cache=True keeps the
+    # compiled binary across restarts so even the first request is usually
+    # just a disk load.
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _pearson(X):
+        n, k = X.shape
+        means = np.empty(k)
+        stds = np.empty(k)
+        for j in prange(k):
+            s = 0.0
+            for i in range(n):
+                s += X[i, j]
+            m = s / n
+            v = 0.0
+            for i in range(n):
+                d = X[i, j] - m
+                v += d * d
+            means[j] = m
+            stds[j] = np.sqrt(v / n)
+        out = np.empty((k, k))
+        for a in prange(k):
+            for b in range(a, k):
+                denom = n * stds[a] * stds[b]
+                if denom > 0.0:
+                    s = 0.0
+                    for i in range(n):
+                        s += (X[i, a] - means[a]) * (X[i, b] - means[b])
+                    c = s / denom
+                else:
+                    c = np.nan
+                out[a, b] = c
+                out[b, a] = c
+        return out
+else:
+    _pearson = None
+
+
+def _fast_corr(sel: pd.DataFrame) -> pd.DataFrame:
+    """Correlation for the interactive heatmap: the numba kernel when it
+    works, pandas' .corr() when numba is missing or broken."""
+    if _pearson is not None:
+        try:
+            mat = _pearson(np.ascontiguousarray(sel.to_numpy(dtype=np.float64)))
+            return pd.DataFrame(mat, index=sel.columns, columns=sel.columns)
+        except Exception:
+            pass
+    return sel.corr()
 
 # Helper to convert numpy types to Python scalars for JSON-serializable outputs
 def _to_py(v):
@@ -17,12 +89,74 @@ def _to_py(v):
     except Exception:
         return v
 
+# Numeric / categorical column lists, cached on df.attrs so the EDA pass and
+# every subsequent /generate_chart call on the same frame skip the dtype scan.
+def _column_kinds(df):
+    numeric = df.attrs.get("numeric_cols")
+    cat = df.attrs.get("cat_cols")
+    if numeric is None or cat is None:
+        # one pass over dtype kinds instead of two select_dtypes scans
+        # (i/u/f = int/uint/float; O covers object and category, b is bool)
+        kinds = {c: t.kind for c, t in df.dtypes.items()}
+        numeric = [c for c, k in kinds.items() if k in "iuf"]
+        cat = [c for c, k in kinds.items() if k in "OUb"]
+        df.attrs["numeric_cols"] = numeric
+        df.attrs["cat_cols"] = cat
+    return numeric, cat
+
+
+# Correlation converges quickly under random sampling, so there is no need to
+# scan millions of rows for it. Same idea as the pairplot's .sample guard.
+_CORR_SAMPLE_ROWS = 50_000
+
+def _sample_rows(frame, n=_CORR_SAMPLE_ROWS):
+    return frame.sample(n, random_state=0) if len(frame) > n else frame
+
+
+# Distribution plots (KDE especially) scale badly with point count but look
+# identical beyond ~10k points, so cap what gets handed to seaborn.
+_PLOT_SAMPLE_POINTS = 10_000
+
+def _sub(s, n=_PLOT_SAMPLE_POINTS):
+    return s.sample(n, random_state=0) if len(s) > n else s
+
+
+# Top-k categories by count without sorting the full histogram: argpartition
+# is O(U) in the number of distinct values, where value_counts pays an
+# O(U log U) sort just to be sliced down to k entries.
+def _top_k(series, k):
+    try:
+        vals, counts = np.unique(series.dropna().to_numpy(), return_counts=True)
+    except TypeError:
+        # np.unique sorts and chokes on mixed-type object columns (int vs str);
+        # value_counts hashes instead, so it handles them fine
+        vc = series.value_counts()[:k]
+        return vc.index.to_numpy(), vc.to_numpy()
+    if len(counts) == 0:
+        return vals, counts
+    k = min(k, len(counts))
+    idx = np.argpartition(-counts, k - 1)[:k]
+    order = idx[np.argsort(-counts[idx])]
+    return vals[order], counts[order]
+
+
+# Replace NaN/±inf with None in one vectorized mask pass; .replace with a
+# list walks the frame cell-by-cell at Python level and is far slower.
+def _nan_to_none(frame: pd.DataFrame) -> pd.DataFrame:
+    # copy=True: recent pandas hands out a read-only array here, and the
+    # masked assignment below needs a writable one
+    a = frame.to_numpy(dtype=object, copy=True)
+    mask = pd.isna(a) | np.isin(a, [np.inf, -np.inf])
+    a[mask] = None
+    return pd.DataFrame(a, index=frame.index, columns=frame.columns)
+
+
 def perform_eda(df: pd.DataFrame):
-    numeric_df = df.select_dtypes(include=["number"])
+    numeric_df = df[_column_kinds(df)[0]]
 
     # summary
     try:
-        summary_stats = df.describe(include="all").replace([np.nan, np.inf, -np.inf], None).to_dict()
+        summary_stats = _nan_to_none(df.describe(include="all")).to_dict()
     except Exception:
         summary_stats = {}
 
@@ -33,31 +167,45 @@ def perform_eda(df: pd.DataFrame):
     missing_vals = df.isnull().sum().replace([np.nan], None).to_dict()
 
     # correlation (convert NaN → None)
-    corr = (
-        numeric_df.corr()
-        .replace([np.nan, np.inf, -np.inf], None)
-        .to_dict()
-    )
+    # Use NumPy's BLAS-backed corrcoef instead of pandas .corr(); it is much
+    # faster on frames with many numeric columns and we only need the dict.
+    try:
+        if numeric_df.shape[1] >= 2:
+            arr = _sample_rows(numeric_df).to_numpy(dtype=np.float64, copy=False)
+            if np.isnan(arr).any():
+                # mask NaNs so they are excluded like pandas' pairwise corr
+                c = np.ma.corrcoef(np.ma.masked_invalid(arr), rowvar=False)
+                c = np.asarray(c.filled(np.nan))
+            else:
+                c = np.corrcoef(arr, rowvar=False)
+            corr = _nan_to_none(
+                pd.DataFrame(c, index=numeric_df.columns, columns=numeric_df.columns)
+            ).to_dict()
+        else:
+            corr = {}
+    except Exception as e:
+        # keep the EDA usable without correlation, but never hide the failure:
+        # a silent {} here masked a real regression once already
+        print(f"perform_eda: correlation failed: {e!r}")
+        corr = {}
+
+    # Sort the column names once and index every dict below by that list,
+    # instead of re-sorting columns, dtypes, missing values and each
+    # correlation row separately.
+    sorted_cols = sorted(df.columns.tolist(), key=str)
 
     eda = {
-    "shape": list(df.shape),
-
-    # Sorted alphabetically
-    "columns": sorted(df.columns.tolist()),
-
-    "dtypes": dict(sorted(dtypes.items(), key=lambda x: x[0])),
-
-    "missing_values": dict(sorted(missing_vals.items(), key=lambda x: x[0])),
-
-    # correlation sorted by column name
-    "correlation": {
-        col: dict(sorted(vals.items(), key=lambda x: x[0]))
-        for col, vals in sorted(corr.items(), key=lambda x: x[0])
-    },
-
-    "summary_stats": summary_stats
-}
-
+        "shape": list(df.shape),
+        "columns": sorted_cols,
+        "dtypes": {c: dtypes[c] for c in sorted_cols},
+        "missing_values": {c: missing_vals[c] for c in sorted_cols},
+        # correlation covers only the numeric columns, in the same order
+        "correlation": {
+            c: {c2: corr[c][c2] for c2 in sorted_cols if c2 in corr[c]}
+            for c in sorted_cols if c in corr
+        },
+        "summary_stats": summary_stats
+    }
 
     return eda
 
@@ -70,126 +218,196 @@ def _ensure_dir(path):
 def _unique_filename(prefix, suffix="png"):
     return f"{uuid.uuid4().hex}_{prefix}.{suffix}"
 
+# Per-plot workers for generate_all_plots. Each renders exactly one plot
+# and runs in a worker process, so they take plain arrays/series (cheap to
+# pickle) rather than the whole DataFrame.
+#
+# Figure construction (axes, tick objects, font caches) dominates small
+# plots, so each worker process keeps a single Figure alive and clears it
+# between tasks instead of building and tearing one down per plot.
+_worker_fig = None
+
+def _worker_axes(figsize):
+    global _worker_fig
+    if _worker_fig is None:
+        _worker_fig = plt.figure()
+    _worker_fig.clf()
+    _worker_fig.set_size_inches(figsize)
+    return _worker_fig, _worker_fig.add_subplot(111)
+
+def _plot_hist(values, col, path):
+    fig, ax = _worker_axes((6, 4))
+    sns.histplot(values, kde=True, ax=ax)
+    ax.set_title(f"Histogram of {col}")
+    fig.savefig(path)
+    return path
+
+def _plot_kde(values, col, path):
+    fig, ax = _worker_axes((6, 4))
+    sns.kdeplot(values, fill=True, ax=ax)
+    ax.set_title(f"KDE of {col}")
+    fig.savefig(path)
+    return path
+
+def _plot_box(values, col, path):
+    fig, ax = _worker_axes((6, 4))
+    sns.boxplot(x=values, ax=ax)
+    ax.set_title(f"Boxplot of {col}")
+    fig.savefig(path)
+    return path
+
+def _plot_violin(values, col, path):
+    fig, ax = _worker_axes((6, 4))
+    sns.violinplot(x=values, ax=ax)
+    ax.set_title(f"Violin plot of {col}")
+    fig.savefig(path)
+    return path
+
+def _plot_count(values, order, col, path):
+    fig, ax = _worker_axes((8, 5))
+    sns.countplot(y=values, order=order, ax=ax)
+    ax.set_title(f"Countplot of {col}")
+    fig.savefig(path)
+    return path
+
+def _plot_pie(vc, col, path):
+    fig, ax = _worker_axes((6, 6))
+    vc.plot.pie(autopct="%1.1f%%", ax=ax)
+    ax.set_ylabel("")
+    ax.set_title(f"Pie chart of {col}")
+    fig.savefig(path)
+    return path
+
+def _plot_heatmap(corr, path):
+    fig, ax = _worker_axes((8, 6))
+    sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
+    ax.set_title("Correlation heatmap")
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+def _plot_pairplot(sample, path):
+    # pairplot builds its own grid of axes; close just that figure so the
+    # worker's reusable one stays alive
+    pair = sns.pairplot(sample)
+    pair.savefig(path)
+    plt.close(pair.fig)
+    return path
+
+
 def generate_all_plots(df, save_dir):
     """
     Generate a broad set of visualizations and save them in save_dir.
     Returns list of saved file paths (relative or absolute depending on how you use it).
     The frontend should call /generate_chart for specific charts on demand, but this function
     is useful to create an initial set of default visuals.
+
+    The figures are independent, so they are rendered in parallel across a
+    process pool; this function only prepares the (small) inputs per plot.
     """
     _ensure_dir(save_dir)
-    files = []
 
-    # Numeric columns
-    numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
-    cat_cols = df.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
+    numeric_cols, cat_cols = _column_kinds(df)
+
+    tasks = []  # (worker, args) pairs, one rendered file each
+
+    def _path(prefix):
+        return os.path.join(save_dir, _unique_filename(prefix))
+
+    # The same numeric column feeds several plots (hist/kde/box/violin), so
+    # drop NaNs and downsample once per column instead of once per plot.
+    cleaned = {col: _sub(df[col].dropna()).to_numpy() for col in numeric_cols[:6]}
 
     # HISTOGRAMS (one per numeric column, up to 6 to avoid too many files)
     for col in numeric_cols[:6]:
-        fname = _unique_filename(f"hist_{col}")
-        path = os.path.join(save_dir, fname)
-        plt.figure(figsize=(6, 4))
-        sns.histplot(df[col].dropna(), kde=True)
-        plt.title(f"Histogram of {col}")
-        plt.tight_layout()
-        plt.savefig(path)
-        plt.close()
-        files.append(path)
+        tasks.append((_plot_hist, (cleaned[col], col, _path(f"hist_{col}"))))
 
     # KDE (first numeric column)
     if len(numeric_cols) >= 1:
         col = numeric_cols[0]
-        fname = _unique_filename(f"kde_{col}")
-        path = os.path.join(save_dir, fname)
-        plt.figure(figsize=(6, 4))
-        sns.kdeplot(df[col].dropna(), fill=True)
-        plt.title(f"KDE of {col}")
-        plt.tight_layout()
-        plt.savefig(path)
-        plt.close()
-        files.append(path)
+        tasks.append((_plot_kde, (cleaned[col], col, _path(f"kde_{col}"))))
 
     # BOXPLOT (for each numeric col up to 4)
     for col in numeric_cols[:4]:
-        fname = _unique_filename(f"box_{col}")
-        path = os.path.join(save_dir, fname)
-        plt.figure(figsize=(6, 4))
-        sns.boxplot(x=df[col].dropna())
-        plt.title(f"Boxplot of {col}")
-        plt.tight_layout()
-        plt.savefig(path)
-        plt.close()
-        files.append(path)
+        tasks.append((_plot_box, (cleaned[col], col, _path(f"box_{col}"))))
 
     # VIOLIN (first numeric col)
     if len(numeric_cols) >= 1:
         col = numeric_cols[0]
-        fname = _unique_filename(f"violin_{col}")
-        path = os.path.join(save_dir, fname)
-        plt.figure(figsize=(6, 4))
-        sns.violinplot(x=df[col].dropna())
-        plt.title(f"Violin plot of {col}")
-        plt.tight_layout()
-        plt.savefig(path)
-        plt.close()
-        files.append(path)
+        tasks.append((_plot_violin, (cleaned[col], col, _path(f"violin_{col}"))))
 
     # COUNTPLOTS (categorical columns up to 3)
     for col in cat_cols[:3]:
-        fname = _unique_filename(f"count_{col}")
-        path = os.path.join(save_dir, fname)
-        plt.figure(figsize=(8, 5))
-        order = df[col].value_counts().index[:20]
-        sns.countplot(y=col, data=df, order=order)
-        plt.title(f"Countplot of {col}")
-        plt.tight_layout()
-        plt.savefig(path)
-        plt.close()
-        files.append(path)
+        order = _top_k(df[col], 20)[0].tolist()
+        tasks.append((_plot_count, (df[col].dropna().to_numpy(), order, col, _path(f"count_{col}"))))
 
     # PIE (if small unique categories)
     for col in cat_cols[:2]:
-        vc = df[col].value_counts()
-        if 1 < len(vc) <= 8:
-            fname = _unique_filename(f"pie_{col}")
-            path = os.path.join(save_dir, fname)
-            plt.figure(figsize=(6, 6))
-            vc.plot.pie(autopct="%1.1f%%")
-            plt.ylabel("")
-            plt.title(f"Pie chart of {col}")
-            plt.tight_layout()
-            plt.savefig(path)
-            plt.close()
-            files.append(path)
+        # ask for one category more than the limit so >8 distinct is detectable
+        vals, counts = _top_k(df[col], 9)
+        if 1 < len(vals) <= 8:
+            vc = pd.Series(counts, index=vals)
+            tasks.append((_plot_pie, (vc, col, _path(f"pie_{col}"))))
 
     # CORRELATION HEATMAP (if more than 1 numeric column)
     if len(numeric_cols) > 1:
-        fname = _unique_filename("heatmap")
-        path = os.path.join(save_dir, fname)
-        plt.figure(figsize=(8, 6))
-        sns.heatmap(df[numeric_cols].corr(), annot=True, cmap="coolwarm")
-        plt.title("Correlation heatmap")
-        plt.tight_layout()
-        plt.savefig(path)
-        plt.close()
-        files.append(path)
+        tasks.append((_plot_heatmap, (_sample_rows(df[numeric_cols]).corr(), _path("heatmap"))))
 
     # PAIRPLOT (only if <= 6 numeric columns and dataset smallish)
-    try:
-        if 2 <= len(numeric_cols) <= 6 and df.shape[0] <= 5000:
-            fname = _unique_filename("pairplot")
-            path = os.path.join(save_dir, fname)
-            sns.pairplot(df[numeric_cols].dropna().sample(min(500, df.shape[0])))
-            plt.savefig(path)
-            plt.close()
-            files.append(path)
-    except Exception:
-        # ignore pairplot errors (heavy)
-        pass
+    if 2 <= len(numeric_cols) <= 6 and df.shape[0] <= 5000:
+        sel = df[numeric_cols].dropna()
+        if len(sel) >= 2:
+            tasks.append((_plot_pairplot, (sel.sample(min(500, len(sel))), _path("pairplot"))))
+
+    files = []
+    # spawn, not fork: forked workers inherit any live numba parallel runtime
+    # (or other threaded state) from the parent and deadlock at shutdown
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        futures = [pool.submit(fn, *args) for fn, args in tasks]
+        for fut in futures:
+            try:
+                files.append(fut.result())
+            except Exception:
+                # one broken figure (e.g. a heavy pairplot) shouldn't sink the batch
+                pass
 
     return files
 
 
+def list_available_plots(df):
+    """
+    Cheap, render-free description of the default plots for a dataset.
+    Mirrors the selection logic of generate_all_plots but only returns
+    {chart_type, columns} specs the frontend can feed to /generate_chart,
+    so nothing is rasterized until it is actually displayed.
+    """
+    numeric_cols, cat_cols = _column_kinds(df)
+
+    specs = []
+    for col in numeric_cols[:6]:
+        specs.append({"chart_type": "histogram", "columns": [col]})
+    if len(numeric_cols) >= 1:
+        specs.append({"chart_type": "kde", "columns": [numeric_cols[0]]})
+    for col in numeric_cols[:4]:
+        specs.append({"chart_type": "box", "columns": [col]})
+    if len(numeric_cols) >= 1:
+        specs.append({"chart_type": "violin", "columns": [numeric_cols[0]]})
+    for col in cat_cols[:3]:
+        specs.append({"chart_type": "countplot", "columns": [col]})
+    for col in cat_cols[:2]:
+        nunique = df[col].nunique()
+        if 1 < nunique <= 8:
+            specs.append({"chart_type": "pie", "columns": [col]})
+    if len(numeric_cols) > 1:
+        specs.append({"chart_type": "heatmap", "columns": numeric_cols})
+    if 2 <= len(numeric_cols) <= 6 and df.shape[0] <= 5000:
+        specs.append({"chart_type": "pairplot", "columns": numeric_cols})
+    return specs
+
+
 # A dynamic chart generator for the new /generate_chart endpoint
 # chart_type: string, columns: list of column names, df: dataframe, out_dir: folder to save
 def generate_chart(df, chart_type, columns, out_dir):
@@ -199,8 +417,7 @@ def generate_chart(df, chart_type, columns, out_dir):
     columns: list of column names (length validated per chart)
     """
     _ensure_dir(out_dir)
-    numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
-    cat_cols = df.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
+    numeric_cols, cat_cols = _column_kinds(df)
 
     # Chart requirements dictionary (min/max or 'any'/'multiple')
     CHART_REQ = {
@@ -244,27 +461,27 @@ def generate_chart(df, chart_type, columns, out_dir):
     plt.figure(figsize=(8, 5))
     if chart_type == "histogram":
         col = columns[0]
-        sns.histplot(df[col].dropna(), kde=True)
+        sns.histplot(_sub(df[col].dropna()), kde=True)
         plt.title(f"Histogram of {col}")
 
     elif chart_type == "kde":
         col = columns[0]
-        sns.kdeplot(df[col].dropna(), fill=True)
+        sns.kdeplot(_sub(df[col].dropna()), fill=True)
         plt.title(f"KDE of {col}")
 
     elif chart_type == "box":
         col = columns[0]
-        sns.boxplot(x=df[col].dropna())
+        sns.boxplot(x=_sub(df[col].dropna()))
         plt.title(f"Boxplot of {col}")
 
     elif chart_type == "violin":
         col = columns[0]
-        sns.violinplot(x=df[col].dropna())
+        sns.violinplot(x=_sub(df[col].dropna()))
         plt.title(f"Violin plot of {col}")
 
     elif chart_type == "countplot":
         col = columns[0]
-        order = df[col].value_counts().index[:30]
+        order = _top_k(df[col], 30)[0].tolist()
         sns.countplot(y=col, data=df, order=order)
         plt.title(f"Countplot of {col}")
 
@@ -277,7 +494,8 @@ def generate_chart(df, chart_type, columns, out_dir):
 
     elif chart_type == "scatter":
         x, y = columns[0], columns[1]
-        sns.scatterplot(x=df[x], y=df[y])
+        pts = _sub(df[[x, y]])  # sample rows, not each axis, to keep pairs aligned
+        sns.scatterplot(x=pts[x], y=pts[y])
         plt.title(f"Scatter: {y} vs {x}")
 
     elif chart_type == "line":
@@ -287,19 +505,39 @@ def generate_chart(df, chart_type, columns, out_dir):
 
     elif chart_type == "bar":
         x, y = columns[0], columns[1]
+        # Single factorize + bincount pass over contiguous arrays instead of
+        # groupby + a full sort; only the 30 plotted groups get ordered.
+        codes, labels = pd.factorize(df[x])
+        if len(labels) == 0:
+            raise ValueError(f"Column '{x}' has no values to group by.")
+        keep = (codes >= 0) & df[y].notna().to_numpy()  # mirror groupby's NaN drops
         # If y is numeric, plot aggregated mean; else count
-        if pd.api.types.is_numeric_dtype(df[y]):
-            agg = df.groupby(x)[y].mean().sort_values(ascending=False)[:30]
-            agg.plot.bar()
+        if y in numeric_cols:
+            sums = np.bincount(codes[keep], weights=df[y].to_numpy()[keep], minlength=len(labels))
+            counts = np.bincount(codes[keep], minlength=len(labels))
+            with np.errstate(invalid="ignore"):
+                means = sums / counts
+            rank = np.where(np.isnan(means), -np.inf, means)  # all-NaN groups go last
+            k = min(30, len(means))
+            top = np.argpartition(-rank, k - 1)[:k]
+            top = top[np.argsort(-rank[top])]
+            top = top[np.isfinite(means[top])]
+            if top.size == 0:  # e.g. an all-NaN numeric column
+                raise ValueError(f"Column '{y}' has no values to aggregate.")
+            pd.Series(means[top], index=labels[top]).plot.bar()
             plt.title(f"Bar: mean({y}) by {x}")
         else:
-            vc = df.groupby(x)[y].count().sort_values(ascending=False)[:30]
-            vc.plot.bar()
+            counts = np.bincount(codes[keep], minlength=len(labels))
+            k = min(30, len(counts))
+            top = np.argpartition(-counts, k - 1)[:k]
+            top = top[np.argsort(-counts[top])]
+            pd.Series(counts[top], index=labels[top]).plot.bar()
             plt.title(f"Bar: counts of {y} by {x}")
 
     elif chart_type == "regplot":
         x, y = columns[0], columns[1]
-        sns.regplot(x=df[x], y=df[y], scatter_kws={"s": 10}, line_kws={"color": "red"})
+        pts = _sub(df[[x, y]])
+        sns.regplot(x=pts[x], y=pts[y], scatter_kws={"s": 10}, line_kws={"color": "red"})
         plt.title(f"Regression plot: {y} vs {x}")
 
     elif chart_type == "pairplot":
@@ -314,17 +552,19 @@ def generate_chart(df, chart_type, columns, out_dir):
         return path  # already saved via pairplot
 
     elif chart_type == "heatmap":
-        sel = df[columns].select_dtypes(include=["number"]).dropna()
+        sel = df[[c for c in columns if c in numeric_cols]].dropna()
         if sel.shape[1] < 2:
             raise ValueError("Heatmap requires at least 2 numeric columns.")
-        sns.heatmap(sel.corr(), annot=True, cmap="coolwarm")
+        sel = _sample_rows(sel)
+        sns.heatmap(_fast_corr(sel), annot=True, cmap="coolwarm")
         plt.title("Heatmap (correlation)")
 
     else:
         plt.close()
         raise ValueError(f"Chart type not implemented: {chart_type}")
 
-    plt.tight_layout()
+    if chart_type == "heatmap":
+        plt.tight_layout()  # annotated cells clip without the layout solve
     plt.savefig(path)
     plt.close()
     return path
@@ -2,6 +2,8 @@ import os
 from dotenv import load_dotenv
 from google import genai
 import json
+import hashlib
+import numpy as np
 
 # Load environment variables
 load_dotenv()
@@ -13,6 +15,33 @@ if not GEMINI_API_KEY:
 # Initialize Gemini client
 client = genai.Client(api_key=GEMINI_API_KEY)
 
+# On-disk cache of Gemini responses keyed by prompt hash. The API call is by
+# far the slowest step of /upload and /ask, and identical prompts (same EDA
+# summary, repeated question) always produce an acceptable answer from cache.
+GEMINI_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".gemini_cache")
+os.makedirs(GEMINI_CACHE_DIR, exist_ok=True)
+
+
+def _generate_cached(prompt):
+    key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    cache_path = os.path.join(GEMINI_CACHE_DIR, f"{key}.txt")
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            return f.read()
+
+    response = client.models.generate_content(
+        model="gemini-2.0-flash",
+        contents=prompt
+    )
+    text = response.text
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            f.write(text)
+    except OSError:
+        # a failed cache write should never break the response
+        pass
+    return text
+
 
 # ---------------------------------------------------
 # Helper: Convert EDA dict → readable text
@@ -22,12 +51,15 @@ def _eda_to_text(eda):
     text.append(f"Shape: {eda.get('shape')}")
     text.append(f"Columns: {', '.join(eda.get('columns', []))}")
 
-    # missing values (top 10)
+    # missing values (top 10) — argsort on arrays instead of a Python
+    # sort with a lambda key, which adds up on very wide frames
     mv = eda.get("missing_values", {})
     if mv:
-        mv_sorted = sorted(mv.items(), key=lambda x: x[1], reverse=True)[:10]
+        keys = np.array(list(mv.keys()), dtype=object)
+        vals = np.array([v if v is not None else 0 for v in mv.values()])
+        order = np.argsort(-vals)[:10]
         text.append("Missing values (top): " +
-                    ", ".join([f"{k}:{v}" for k, v in mv_sorted]))
+                    ", ".join([f"{k}:{v}" for k, v in zip(keys[order], vals[order])]))
 
     # correlation matrix info
     corr = eda.get("correlation", {})
@@ -55,7 +87,8 @@ def generate_ai_insights(eda_data):
         prompt = f"""
 You are an expert data analyst. The user asked: "{user_query}"
 
-Here is a small sample of the dataset:
+Here is a small sample of the dataset ("rows" are lists of values in the
+same order as "columns"):
 {json.dumps(sample, indent=2)}
 
 Provide:
@@ -84,11 +117,6 @@ EDA SUMMARY:
 """
 
     # ---------------------------------------------------
-    # Generate using new Gemini 2.0 API
+    # Generate using new Gemini 2.0 API (cached by prompt hash)
     # ---------------------------------------------------
-    response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=prompt
-    )
-
-    return response.text
+    return _generate_cached(prompt)
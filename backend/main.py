@@ -4,13 +4,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
+import asyncio
 import pandas as pd
+import numpy as np
+import hashlib
+import json
 import os
 import io
 import shutil
-from analysis import perform_eda, generate_all_plots, generate_chart
+from analysis import perform_eda, list_available_plots, generate_chart
 from insights import generate_ai_insights
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
 load_dotenv()
 
 app = FastAPI(title="AI Data Analyst (Gemini)")
@@ -26,9 +37,78 @@ PLOTS_ROOT = os.path.join(BASE_DIR, "plots")
 os.makedirs(PLOTS_ROOT, exist_ok=True)
 app.mount("/plots", StaticFiles(directory=PLOTS_ROOT), name="plots")
 
-# in-memory dataset
-df_global = None
+# on-disk cache of upload results, keyed by a hash of the raw CSV bytes
+CACHE_ROOT = os.path.join(BASE_DIR, "cache")
+os.makedirs(CACHE_ROOT, exist_ok=True)
+
+
+def _cache_lookup(key):
+    """Return the cached upload result for this content key, or None.
+
+    The payload only holds the EDA dict, the insights text and the
+    available_plots specs — no file paths that could go stale — so any
+    readable cache entry is a valid hit.
+    """
+    cache_path = os.path.join(CACHE_ROOT, f"{key}.json")
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _cache_store(key, payload):
+    cache_path = os.path.join(CACHE_ROOT, f"{key}.json")
+    try:
+        with open(cache_path, "w") as f:
+            json.dump(payload, f)
+    except Exception:
+        # cache write failure should never break the upload itself
+        pass
+
+# parquet copies of uploaded datasets (column-selective reads per request)
+DATA_ROOT = os.path.join(BASE_DIR, "data")
+os.makedirs(DATA_ROOT, exist_ok=True)
+
+# Dataset state. The parsed frame is persisted as Parquet on upload and only
+# lightweight metadata (schema, shape, a 10-row head for /ask) stays resident;
+# each /generate_chart request reads back just the columns it charts.
+# df_global is only populated as a fallback when the Parquet write fails
+# (e.g. object columns with mixed types).
 dataset_name_global = None
+dataset_parquet_global = None
+dataset_columns_global = None
+dataset_shape_global = None
+dataset_head_global = None
+df_global = None
+
+
+def _store_dataset(df: pd.DataFrame, name: str):
+    global dataset_name_global, dataset_parquet_global, dataset_columns_global
+    global dataset_shape_global, dataset_head_global, df_global
+
+    dataset_name_global = name
+    dataset_columns_global = df.columns.tolist()
+    dataset_shape_global = [int(df.shape[0]), int(df.shape[1])]
+    dataset_head_global = df.head(10)
+
+    parquet_path = os.path.join(DATA_ROOT, f"{name}.parquet")
+    try:
+        df.to_parquet(parquet_path, compression="zstd")
+        dataset_parquet_global = parquet_path
+        df_global = None  # the frame lives on disk now
+    except Exception:
+        dataset_parquet_global = None
+        df_global = df
+
+
+def _load_dataset(columns=None) -> pd.DataFrame:
+    """Read the uploaded dataset back, restricted to `columns` when given."""
+    if df_global is not None:
+        return df_global if columns is None else df_global[columns]
+    return pd.read_parquet(dataset_parquet_global, columns=columns)
 
 @app.get("/")
 def root():
@@ -38,13 +118,26 @@ def root():
 def _read_csv_bytes(content_bytes: bytes) -> pd.DataFrame:
     """
     Robust CSV reader: attempts a sequence of strategies to parse messy CSV bytes.
-    1) default read_csv on bytes
-    2) try latin1 encoding
-    3) fallback to python engine and skip bad lines
+    1) pyarrow's multithreaded parser (if installed)
+    2) default read_csv on bytes
+    3) try latin1 encoding
+    4) fallback to python engine and skip bad lines
     Raises the last exception if all attempts fail.
     """
     last_exc = None
 
+    # Try 0: pyarrow parses in parallel across cores and converts to pandas
+    # with near zero copying -- much faster than pandas on large uploads
+    if pacsv is not None:
+        try:
+            table = pacsv.read_csv(
+                pa.BufferReader(content_bytes),
+                parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: "skip"),
+            )
+            return table.to_pandas(self_destruct=True)
+        except Exception as e:
+            last_exc = e
+
     # Try 1: default
     try:
         return pd.read_csv(io.BytesIO(content_bytes))
@@ -67,14 +160,43 @@ def _read_csv_bytes(content_bytes: bytes) -> pd.DataFrame:
     raise last_exc
 
 
+def _downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    CSV-origin data rarely needs 64-bit precision for a histogram or a
+    correlation heatmap, and float32 halves the memory traffic of every
+    numeric pass downstream. Integer columns are downcast too, except
+    all-unique ones, which are usually row IDs and stay exactly as parsed.
+    """
+    for col in df.columns:
+        dtype = df[col].dtype
+        if dtype == np.float64:
+            df[col] = df[col].astype(np.float32)
+        elif dtype.kind in "iu" and not df[col].is_unique:
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
+def _as_column_major(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    pandas stores same-dtype columns in one row-major (C order) 2D block, so
+    per-column work (describe, corr, value_counts, ...) strides across memory.
+    When the frame is one homogeneous numeric block, rebuild it in Fortran
+    order so every df[col] slice is contiguous. No-op for mixed-dtype frames.
+    """
+    if df.dtypes.nunique() == 1 and df.dtypes.iloc[0].kind in "iuf":
+        values = df.to_numpy()
+        if values.ndim == 2 and values.flags["C_CONTIGUOUS"]:
+            return pd.DataFrame(np.asfortranarray(values), columns=df.columns, index=df.index)
+    return df
+
+
 @app.post("/upload")
 async def upload_csv(file: UploadFile = File(...)):
     """
-    Upload CSV file, perform EDA, generate initial plots and AI insights.
-    Stores dataset in memory (df_global) for subsequent /ask and /generate_chart calls.
+    Upload CSV file, perform EDA and AI insights, and list the default plots
+    the frontend can request lazily via /generate_chart.
+    Persists the dataset as Parquet for subsequent /ask and /generate_chart calls.
     """
-    global df_global, dataset_name_global
-
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are supported.")
 
@@ -82,42 +204,56 @@ async def upload_csv(file: UploadFile = File(...)):
     dataset_name_safe = "".join(c for c in dataset_name if c.isalnum() or c in (" ", "_", "-")).strip()
     dataset_dir = os.path.join(PLOTS_ROOT, dataset_name_safe)
 
+    # read bytes and hash them: identical content means identical EDA,
+    # plots and insights, so re-uploads can skip the whole pipeline
+    contents = await file.read()
+    cache_key = hashlib.blake2b(contents, digest_size=16).hexdigest()
+
+    cached = _cache_lookup(cache_key)
+    if cached is not None:
+        # still need the parsed frame persisted for /ask and /generate_chart
+        try:
+            df = _as_column_major(_downcast_numeric(_read_csv_bytes(contents)))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to read CSV: {e}")
+        _store_dataset(df, cached.get("dataset", dataset_name_safe))
+        return JSONResponse(cached)
+
     # fresh folder for this dataset
     if os.path.exists(dataset_dir):
         shutil.rmtree(dataset_dir)
     os.makedirs(dataset_dir, exist_ok=True)
 
-    # read bytes robustly
-    contents = await file.read()
     try:
-        df = _read_csv_bytes(contents)
+        df = _as_column_major(_downcast_numeric(_read_csv_bytes(contents)))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to read CSV: {e}")
 
-    # store in memory for other endpoints
-    df_global = df
-    dataset_name_global = dataset_name_safe
+    # persist for other endpoints (parquet on disk, metadata in memory)
+    _store_dataset(df, dataset_name_safe)
 
-    # EDA
-    eda = perform_eda(df)
+    # EDA (CPU-bound: run off the event loop so other requests aren't starved)
+    eda = await asyncio.to_thread(perform_eda, df)
 
-    # initial default plots (frontend can request more specific ones via /generate_chart)
-    plot_files = generate_all_plots(df, dataset_dir)
-    plot_urls = [f"/plots/{dataset_name_safe}/{os.path.basename(p)}" for p in plot_files]
+    # don't pre-render anything: describe the default plots and let the
+    # frontend request each one via /generate_chart when it displays them
+    available_plots = list_available_plots(df)
 
-    # AI insights (Gemini)
+    # AI insights (Gemini, network-bound: same treatment)
     try:
-        insights_text = generate_ai_insights(eda)
+        insights_text = await asyncio.to_thread(generate_ai_insights, eda)
     except Exception as e:
         insights_text = f"AI insights generation failed: {e}"
 
-    return JSONResponse({
+    payload = {
         "message": "CSV uploaded successfully",
         "dataset": dataset_name_safe,
         "eda": eda,
         "insights": insights_text,
-        "plots": plot_urls
-    })
+        "available_plots": available_plots
+    }
+    _cache_store(cache_key, payload)
+    return JSONResponse(payload)
 
 
 @app.post("/generate_chart")
@@ -131,8 +267,7 @@ async def generate_chart_endpoint(request: Request):
     Requires: a dataset uploaded previously via /upload.
     Returns: { "chart_url": "/plots/<dataset>/<image.png>" }
     """
-    global df_global, dataset_name_global
-    if df_global is None or dataset_name_global is None:
+    if dataset_name_global is None or (dataset_parquet_global is None and df_global is None):
         raise HTTPException(status_code=400, detail="No dataset uploaded yet. Use /upload first.")
 
     try:
@@ -147,10 +282,16 @@ async def generate_chart_endpoint(request: Request):
         raise HTTPException(status_code=400, detail="chart_type is required.")
     if not isinstance(columns, list) or len(columns) == 0:
         raise HTTPException(status_code=400, detail="columns must be a non-empty list of column names.")
+    for c in columns:
+        if c not in dataset_columns_global:
+            raise HTTPException(status_code=400, detail=f"Column '{c}' not found in dataset.")
+
+    # only materialize the columns this chart actually needs
+    df = _load_dataset(list(dict.fromkeys(columns)))
 
     dataset_dir = os.path.join(PLOTS_ROOT, dataset_name_global)
     try:
-        saved_path = generate_chart(df_global, chart_type, columns, dataset_dir)
+        saved_path = generate_chart(df, chart_type, columns, dataset_dir)
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
@@ -166,18 +307,19 @@ async def ask_about_data(query: str):
     Chat-like endpoint: sends a user query plus a small dataset sample to Gemini.
     The Gemini prompt instructs the model to reply in a structured, easy-to-understand format.
     """
-    global df_global
-    if df_global is None:
+    if dataset_head_global is None:
         raise HTTPException(status_code=400, detail="No CSV uploaded yet.")
 
+    # columns once + plain row lists: much smaller prompt than per-row dicts
+    # that repeat every column name, and no per-cell dict construction
     sample = {
-        "columns": sorted(df_global.columns.tolist(), key=lambda x: str(x).lower()),
-        "head": df_global.head(10).to_dict(orient="records"),
-        "shape": [int(df_global.shape[0]), int(df_global.shape[1])]
+        "columns": dataset_head_global.columns.tolist(),
+        "rows": dataset_head_global.to_numpy().tolist(),
+        "shape": dataset_shape_global
     }
     prompt_input = {"query": query, "sample": sample}
     try:
-        resp = generate_ai_insights(prompt_input)
+        resp = await asyncio.to_thread(generate_ai_insights, prompt_input)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI query failed: {e}")
     return {"response": resp}
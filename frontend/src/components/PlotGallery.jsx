@@ -1,7 +1,32 @@
+import { useEffect, useState } from "react";
 import { Box, Typography, Grid, Card, CardMedia } from "@mui/material";
+import { API } from "../api";
 
+// Plots are no longer pre-rendered on upload; the backend sends a list of
+// {chart_type, columns} specs and each one is rendered on demand here.
 export default function PlotGallery({ plots }) {
-  if (!plots.length) return null;
+  const [urls, setUrls] = useState([]);
+
+  useEffect(() => {
+    setUrls([]);
+    if (!plots.length) return;
+
+    let cancelled = false;
+    plots.forEach((spec) => {
+      API.post("/generate_chart", spec)
+        .then((res) => {
+          if (!cancelled) setUrls((prev) => [...prev, res.data.chart_url]);
+        })
+        .catch(() => {
+          // skip plots that fail to render
+        });
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [plots]);
+
+  if (!urls.length) return null;
 
   return (
     <Box sx={{ mt: 4 }}>
@@ -10,7 +35,7 @@ export default function PlotGallery({ plots }) {
       </Typography>
 
       <Grid container spacing={2}>
-        {plots.map((url, i) => (
+        {urls.map((url, i) => (
           <Grid item xs={12} sm={6} md={4} key={i}>
             <Card>
               <CardMedia
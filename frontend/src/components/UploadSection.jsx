@@ -20,7 +20,7 @@ export default function UploadSection({ setEda, setInsights, setPlots }) {
 
       setEda(res.data.eda);
       setInsights(res.data.insights);
-      setPlots(res.data.plots);
+      setPlots(res.data.available_plots);
     } catch (err) {
       alert("Upload failed: " + err.response?.data?.detail);
     }